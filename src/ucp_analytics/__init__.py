@@ -15,7 +15,7 @@ from ucp_analytics.client_hooks import UCPClientEventHook
 from ucp_analytics.events import CheckoutStatus, UCPEvent, UCPEventType
 from ucp_analytics.parser import UCPResponseParser
 from ucp_analytics.tracker import UCPAnalyticsTracker
-from ucp_analytics.writer import AsyncBigQueryWriter
+from ucp_analytics.writer import AsyncBigQueryWriter, shutdown
 
 
 def __getattr__(name: str):
@@ -33,6 +33,7 @@ __all__ = [
     "CheckoutStatus",
     "UCPResponseParser",
     "AsyncBigQueryWriter",
+    "shutdown",
     "UCPAnalyticsMiddleware",
     "UCPClientEventHook",
 ]
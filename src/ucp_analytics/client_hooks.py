@@ -26,6 +26,7 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 import time
 from typing import Any
 
@@ -33,6 +34,13 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+# One compiled alternation so the UCP-path check is a single C-level scan
+# instead of one substring search per pattern.
+_UCP_PATH_RE = re.compile(
+    r"/(?:checkout-sessions|carts|\.well-known/ucp|orders|identity|"
+    r"simulate-shipping|webhooks?)"
+)
+
 
 class UCPClientEventHook:
     """HTTPX response event hook that records UCP analytics.
@@ -61,8 +69,8 @@ class UCPClientEventHook:
         request = response.request
         path = request.url.path
 
-        # Skip non-UCP requests
-        if not any(p in path for p in self.UCP_PATH_PATTERNS):
+        # Skip non-UCP requests (single scan over the path)
+        if _UCP_PATH_RE.search(path) is None:
             return
 
         # Read response body
@@ -100,6 +108,8 @@ class UCPClientEventHook:
                 response_body=response_body,
                 latency_ms=latency_ms,
                 request_headers=headers,
+                request_raw=request.content or None,
+                response_raw=response.content or None,
             )
         except Exception:
             logger.exception("UCP client analytics recording failed")
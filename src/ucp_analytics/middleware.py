@@ -66,17 +66,19 @@ class UCPAnalyticsMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         path = request.url.path
 
-        # Fast path: skip non-UCP requests
-        if not any(path.startswith(p) for p in self.UCP_PATH_PREFIXES):
+        # Fast path: skip non-UCP requests.  str.startswith takes the
+        # whole prefix tuple in one C call — no per-prefix Python loop.
+        if not path.startswith(self.UCP_PATH_PREFIXES):
             return await call_next(request)
 
         # Read request body (for POST/PUT)
         request_body = None
+        request_raw = b""
         if request.method in ("POST", "PUT", "PATCH"):
             try:
-                raw = await request.body()
-                if raw:
-                    request_body = json.loads(raw)
+                request_raw = await request.body()
+                if request_raw:
+                    request_body = json.loads(request_raw)
             except Exception:
                 pass
 
@@ -114,6 +116,8 @@ class UCPAnalyticsMiddleware(BaseHTTPMiddleware):
                     response_body=response_body,
                     latency_ms=latency_ms,
                     request_headers=headers,
+                    request_raw=request_raw or None,
+                    response_raw=body_bytes or None,
                 )
             )
             self.tracker.register_pending_task(task)
@@ -12,10 +12,326 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Any, Dict, Optional
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 from ucp_analytics.events import UCPEventType
 
+try:  # optional: 3-5x faster serialization for line_items/messages/etc.
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=str).decode()
+
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, default=str)
+
+
+def _raw_json_slice(raw: str, key: str) -> Optional[str]:
+    """Return the raw JSON substring for a top-level *key* array/object value.
+
+    Pass-through fields (``line_items_json``, ``messages_json``) re-encode
+    lists that were just decoded from the wire; when the caller still has
+    the raw body, slicing the original JSON text skips that encode pass
+    entirely.  Returns ``None`` (caller falls back to serializing) when the
+    key is absent, appears more than once in the document (so the single
+    occurrence cannot be assumed top-level), or the value is not a
+    container.
+    """
+    needle = f'"{key}"'
+    start = raw.find(needle)
+    if start == -1 or raw.find(needle, start + len(needle)) != -1:
+        return None
+    i = start + len(needle)
+    n = len(raw)
+    while i < n and raw[i] in " \t\r\n":
+        i += 1
+    if i >= n or raw[i] != ":":
+        return None
+    i += 1
+    while i < n and raw[i] in " \t\r\n":
+        i += 1
+    if i >= n or raw[i] not in "[{":
+        return None
+    open_ch = raw[i]
+    close_ch = "]" if open_ch == "[" else "}"
+    depth = 0
+    in_str = False
+    escaped = False
+    for j in range(i, n):
+        ch = raw[j]
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return raw[i : j + 1]
+    return None
+
+
+def _set(result: Dict[str, Any], key: str, value: Any) -> None:
+    """Assign *value* only when it is not None.
+
+    extract() and its helpers route every possibly-None assignment through
+    here, so the result dict never holds Nones and no final drop-None
+    sweep is needed.
+    """
+    if value is not None:
+        result[key] = value
+
+
+# Spec total type → result field for _extract_totals.
+_TOTAL_TYPE_MAP = {
+    "items_discount": "items_discount_amount",
+    "subtotal": "subtotal_amount",
+    "discount": "discount_amount",
+    "fulfillment": "fulfillment_amount",
+    "tax": "tax_amount",
+    "fee": "fee_amount",
+    "total": "total_amount",
+}
+
+# Spec-defined checkout state machine statuses (see events.CheckoutStatus).
+_CHECKOUT_STATUSES = frozenset(
+    {
+        "incomplete",
+        "requires_escalation",
+        "ready_for_complete",
+        "complete_in_progress",
+        "completed",
+        "canceled",
+    }
+)
+
+
+# Top-level keys that mark a body as carrying commerce payload.  Discovery
+# and identity responses have none of these, so extract() can skip every
+# commerce section with one set probe.
+_COMMERCE_KEYS = frozenset(
+    {
+        "order",
+        "totals",
+        "line_items",
+        "payment",
+        "payment_data",
+        "fulfillment",
+        "discounts",
+    }
+)
+
+# Order lifecycle body-status → event.  Shared by the /orders and webhook
+# branches of classification ("cancelled" is the British-spelling alias).
+_ORDER_STATUS_TO_EVENT = {
+    "shipped": UCPEventType.ORDER_SHIPPED,
+    "delivered": UCPEventType.ORDER_DELIVERED,
+    "returned": UCPEventType.ORDER_RETURNED,
+    "canceled": UCPEventType.ORDER_CANCELED,
+    "cancelled": UCPEventType.ORDER_CANCELED,
+}
+
+# Legacy webhook path suffixes (/webhooks/order-delivered and the
+# underscore variants) → event, one lookup instead of paired membership
+# tests per suffix.
+_WEBHOOK_SUFFIX_EVENTS = {
+    "order-delivered": UCPEventType.ORDER_DELIVERED,
+    "order_delivered": UCPEventType.ORDER_DELIVERED,
+    "order-returned": UCPEventType.ORDER_RETURNED,
+    "order_returned": UCPEventType.ORDER_RETURNED,
+    "order-canceled": UCPEventType.ORDER_CANCELED,
+    "order_canceled": UCPEventType.ORDER_CANCELED,
+}
+
+
+# ---------------------------------------------------------------------------
+# Route grammar for REST path classification
+# ---------------------------------------------------------------------------
+
+# Declarative (method, path template, event) tuples.  Templates are matched
+# against the *tail* of the request path, so prefixed deployments
+# (e.g. /api/v1/checkout-sessions) classify the same as bare paths.
+_ROUTE_PATTERNS = [
+    ("POST", "/checkout-sessions", UCPEventType.CHECKOUT_SESSION_CREATED),
+    (
+        "POST",
+        "/checkout-sessions/{id}/complete",
+        UCPEventType.CHECKOUT_SESSION_COMPLETED,
+    ),
+    (
+        "POST",
+        "/checkout-sessions/{id}/cancel",
+        UCPEventType.CHECKOUT_SESSION_CANCELED,
+    ),
+    ("PUT", "/checkout-sessions/{id}", UCPEventType.CHECKOUT_SESSION_UPDATED),
+    ("GET", "/checkout-sessions/{id}", UCPEventType.CHECKOUT_SESSION_GET),
+    ("POST", "/carts", UCPEventType.CART_CREATED),
+    ("POST", "/carts/{id}/cancel", UCPEventType.CART_CANCELED),
+    ("PUT", "/carts/{id}", UCPEventType.CART_UPDATED),
+    ("GET", "/carts/{id}", UCPEventType.CART_GET),
+]
+
+
+def _build_route_table(patterns: list) -> Dict[tuple, UCPEventType]:
+    """Compile route patterns into a flat dispatch table.
+
+    Keys are ``(method, resource_segment, tail)`` where *tail* is ``None``
+    for a collection route (``/carts``), ``"{id}"`` for an item route
+    (``/carts/{id}``), or the literal action segment for an action route
+    (``/carts/{id}/cancel``).  classify() splits the path once and probes
+    the table with at most three keys — no regex work at call time.
+    """
+    table: Dict[tuple, UCPEventType] = {}
+    for method, pattern, event in patterns:
+        segs = pattern.strip("/").split("/")
+        if len(segs) == 1:
+            key = (method, segs[0], None)
+        elif len(segs) == 2:
+            key = (method, segs[0], "{id}")
+        else:
+            key = (method, segs[0], segs[2])
+        table[key] = event
+    return table
+
+
+_ROUTE_TABLE = _build_route_table(_ROUTE_PATTERNS)
+
+
+# ---------------------------------------------------------------------------
+# Path canonicalization (for the classification cache)
+# ---------------------------------------------------------------------------
+
+# Segments whose immediate successor is an opaque ID in the UCP grammar.
+_ID_PARENT_SEGMENTS = frozenset(
+    {"checkout-sessions", "carts", "orders", "partners", "simulate-shipping"}
+)
+
+# Fallback for ID-looking segments in unrecognized positions (UUIDs, hex ids).
+_ID_SEGMENT_RE = re.compile(r"^[0-9a-fA-F-]{8,}$")
+
+
+@lru_cache(maxsize=2048)
+def _canonical_path(path: str) -> str:
+    """Collapse ID-like segments to ``{id}`` so hot path templates share a
+    cache entry.
+
+    Cached on the literal path: clients repeatedly poll the same session
+    or order URL, so even ID-bearing paths repeat within a deployment.
+
+    ``POST /checkout-sessions/abc/complete`` and
+    ``POST /checkout-sessions/xyz/complete`` classify identically, so both
+    canonicalize to ``/checkout-sessions/{id}/complete``.
+    """
+    parts = path.split("/")
+    prev = ""
+    for i, seg in enumerate(parts):
+        if seg and (prev in _ID_PARENT_SEGMENTS or _ID_SEGMENT_RE.match(seg)):
+            parts[i] = "{id}"
+        prev = seg
+    return "/".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def _classify_impl(
+    m: str,
+    p: str,
+    status_code: int,
+    resp_status: Optional[str],
+    hook_status: Optional[str],
+) -> UCPEventType:
+    """Classification core, keyed only on hashable inputs.
+
+    Callers pass the uppercased method, the canonicalized path, and the
+    pre-extracted ``status`` strings from the response body
+    (``resp_status``) and from the webhook payload body (``hook_status``),
+    so identical request shapes hit the LRU cache and skip all path work.
+    """
+    p = p.rstrip("/")
+
+    # Split once; every route check below works on the segments.
+    parts = p.split("/")
+    tail = parts[-1]
+    prev = parts[-2] if len(parts) > 1 else ""
+    prev2 = parts[-3] if len(parts) > 2 else ""
+
+    # /.well-known/ucp  →  discovery
+    if tail == "ucp" and prev == ".well-known":
+        return UCPEventType.PROFILE_DISCOVERED
+
+    # Checkout / cart routes: probe the compiled dispatch table with
+    # the three possible tail shapes (collection, item, action).
+    event = (
+        _ROUTE_TABLE.get((m, tail, None))
+        or _ROUTE_TABLE.get((m, prev, "{id}"))
+        or _ROUTE_TABLE.get((m, prev2, tail))
+    )
+    if event is not None:
+        # PUT /checkout-sessions/{id} may surface an escalation
+        if event is UCPEventType.CHECKOUT_SESSION_UPDATED:
+            if resp_status == "requires_escalation":
+                return UCPEventType.CHECKOUT_ESCALATION
+        return event
+
+    # /orders (strict: /orders or /orders/{id}, not /reorder etc.)
+    if tail == "orders" or prev == "orders":
+        if m == "POST":
+            return UCPEventType.ORDER_CREATED
+        # Response body status may carry an order lifecycle event
+        event = _ORDER_STATUS_TO_EVENT.get(resp_status)
+        return event if event is not None else UCPEventType.ORDER_UPDATED
+
+    # Webhook paths for order lifecycle
+    # Upstream: POST /webhooks/partners/{partner_id}/events/order
+    hook_next = None
+    for i in range(len(parts) - 1):
+        if parts[i] in ("webhook", "webhooks"):
+            hook_next = parts[i + 1]
+            break
+    if hook_next is not None:
+        # Webhook errors should still classify as errors
+        if status_code and status_code >= 400:
+            return UCPEventType.ERROR
+        # Check for upstream partner webhook format
+        # Payload is in the request body; response is just ack
+        if "/partners/" in p and "/events/order" in p:
+            event = _ORDER_STATUS_TO_EVENT.get(hook_status)
+            return event if event is not None else UCPEventType.ORDER_UPDATED
+        # Legacy: /webhooks/order-delivered etc.; generic webhooks are
+        # treated as order updates.
+        event = _WEBHOOK_SUFFIX_EVENTS.get(hook_next)
+        return event if event is not None else UCPEventType.ORDER_UPDATED
+
+    # Identity linking (strict: /identity or /oauth paths)
+    if "identity" in parts or "oauth" in parts:
+        # /identity/revoke or DELETE → revoked
+        if "/revoke" in p or m == "DELETE":
+            return UCPEventType.IDENTITY_LINK_REVOKED
+        # /identity/callback or /oauth/callback → completed
+        if "/callback" in p:
+            return UCPEventType.IDENTITY_LINK_COMPLETED
+        return UCPEventType.IDENTITY_LINK_INITIATED
+
+    # Simulate shipping (samples server testing endpoint)
+    if "simulate-shipping" in parts:
+        return UCPEventType.ORDER_SHIPPED
+
+    # Errors
+    if status_code and status_code >= 400:
+        return UCPEventType.ERROR
+
+    return UCPEventType.REQUEST
+
 
 class UCPResponseParser:
     """Extract analytics-relevant fields from UCP request/response bodies."""
@@ -24,137 +340,60 @@ class UCPResponseParser:
     # Classify event type from HTTP method + path + body
     # ------------------------------------------------------------------ #
 
-    @classmethod
+    @staticmethod
     def classify(
-        cls,
         method: str,
         path: str,
         status_code: int,
         response_body: Optional[dict],
         request_body: Optional[dict] = None,
     ) -> UCPEventType:
-        """Derive the UCP event type from the HTTP request + response."""
-        m = method.upper()
-        p = path.rstrip("/")
-
-        # /.well-known/ucp  →  discovery
-        if p.endswith("/.well-known/ucp"):
-            return UCPEventType.PROFILE_DISCOVERED
-
-        # /checkout-sessions  POST  → created
-        if re.search(r"/checkout-sessions/?$", p) and m == "POST":
-            return UCPEventType.CHECKOUT_SESSION_CREATED
-
-        # /checkout-sessions/{id}/complete  POST  → completed
-        if re.search(r"/checkout-sessions/[^/]+/complete$", p) and m == "POST":
-            return UCPEventType.CHECKOUT_SESSION_COMPLETED
-
-        # /checkout-sessions/{id}/cancel  POST  → canceled
-        if re.search(r"/checkout-sessions/[^/]+/cancel$", p) and m == "POST":
-            return UCPEventType.CHECKOUT_SESSION_CANCELED
-
-        # /checkout-sessions/{id}  PUT  → updated (or escalation)
-        if re.search(r"/checkout-sessions/[^/]+$", p) and m == "PUT":
-            if response_body and response_body.get("status") == "requires_escalation":
-                return UCPEventType.CHECKOUT_ESCALATION
-            return UCPEventType.CHECKOUT_SESSION_UPDATED
-
-        # /checkout-sessions/{id}  GET  → get
-        if re.search(r"/checkout-sessions/[^/]+$", p) and m == "GET":
-            return UCPEventType.CHECKOUT_SESSION_GET
-
-        # /carts  POST  → created
-        if re.search(r"/carts/?$", p) and m == "POST":
-            return UCPEventType.CART_CREATED
-
-        # /carts/{id}/cancel  POST  → canceled
-        if re.search(r"/carts/[^/]+/cancel$", p) and m == "POST":
-            return UCPEventType.CART_CANCELED
-
-        # /carts/{id}  PUT  → updated
-        if re.search(r"/carts/[^/]+$", p) and m == "PUT":
-            return UCPEventType.CART_UPDATED
-
-        # /carts/{id}  GET  → get
-        if re.search(r"/carts/[^/]+$", p) and m == "GET":
-            return UCPEventType.CART_GET
-
-        # /orders (strict: /orders or /orders/{id}, not /reorder etc.)
-        if re.search(r"/orders(?:/[^/]+)?$", p):
-            if m == "POST":
-                return UCPEventType.ORDER_CREATED
-            # Check response body status for order lifecycle events
-            if response_body and isinstance(response_body, dict):
-                order_status = response_body.get("status", "")
-                if order_status == "delivered":
-                    return UCPEventType.ORDER_DELIVERED
-                if order_status == "returned":
-                    return UCPEventType.ORDER_RETURNED
-                if order_status in ("canceled", "cancelled"):
-                    return UCPEventType.ORDER_CANCELED
-            return UCPEventType.ORDER_UPDATED
-
-        # Webhook paths for order lifecycle
-        # Upstream: POST /webhooks/partners/{partner_id}/events/order
-        if re.search(r"/webhooks?/", p):
-            # Webhook errors should still classify as errors
-            if status_code and status_code >= 400:
-                return UCPEventType.ERROR
-            # Check for upstream partner webhook format
-            # Payload is in the request body; response is just ack
-            if re.search(r"/webhooks?/partners/[^/]+/events/order", p):
-                body = (
-                    request_body
-                    if request_body and isinstance(request_body, dict)
-                    else response_body
-                )
-                if body and isinstance(body, dict):
-                    order_status = body.get("status", "")
-                    if order_status == "shipped":
-                        return UCPEventType.ORDER_SHIPPED
-                    if order_status == "delivered":
-                        return UCPEventType.ORDER_DELIVERED
-                    if order_status == "returned":
-                        return UCPEventType.ORDER_RETURNED
-                    if order_status in ("canceled", "cancelled"):
-                        return UCPEventType.ORDER_CANCELED
-                return UCPEventType.ORDER_UPDATED
-            # Legacy: /webhooks/order-delivered etc.
-            if re.search(r"/webhooks?/order[_-]delivered", p):
-                return UCPEventType.ORDER_DELIVERED
-            if re.search(r"/webhooks?/order[_-]returned", p):
-                return UCPEventType.ORDER_RETURNED
-            if re.search(r"/webhooks?/order[_-]canceled", p):
-                return UCPEventType.ORDER_CANCELED
-            # Generic webhook → treat as order update
-            return UCPEventType.ORDER_UPDATED
-
-        # Identity linking (strict: /identity or /oauth paths)
-        if re.search(r"/(?:identity|oauth)(?:/|$)", p):
-            # /identity/revoke or DELETE → revoked
-            if "/revoke" in p or m == "DELETE":
-                return UCPEventType.IDENTITY_LINK_REVOKED
-            # /identity/callback or /oauth/callback → completed
-            if "/callback" in p:
-                return UCPEventType.IDENTITY_LINK_COMPLETED
-            return UCPEventType.IDENTITY_LINK_INITIATED
-
-        # Simulate shipping (samples server testing endpoint)
-        if "/simulate-shipping" in p:
-            return UCPEventType.ORDER_SHIPPED
-
-        # Errors
-        if status_code and status_code >= 400:
-            return UCPEventType.ERROR
+        """Derive the UCP event type from the HTTP request + response.
 
-        return UCPEventType.REQUEST
+        Classification only depends on the method, the path shape, the
+        status code, and the ``status`` field of the bodies — so the body
+        statuses are pre-extracted and the work is delegated to an
+        LRU-cached core keyed on the canonicalized path.
+        """
+        # Fast path: no bodies at all (webhook acks, reads, errors) — no
+        # status extraction work, both statuses are None.
+        if response_body is None and request_body is None:
+            resp_status = hook_status = None
+        else:
+            resp_status = (
+                response_body.get("status")
+                if type(response_body) is dict
+                else None
+            )
+            # Webhook payloads arrive in the request body; the response
+            # is just an ack.
+            if request_body and type(request_body) is dict:
+                hook_status = request_body.get("status")
+            else:
+                hook_status = resp_status
+            # Non-string statuses (numbers, dicts, lists — all valid
+            # JSON) never match any status table; coerce them to None
+            # so the cache key stays hashable.
+            if type(resp_status) is not str:
+                resp_status = None
+            if type(hook_status) is not str:
+                hook_status = None
+        return _classify_impl(
+            method.upper(),
+            _canonical_path(path),
+            status_code,
+            resp_status,
+            hook_status,
+        )
 
     # ------------------------------------------------------------------ #
     # JSON-RPC classification (MCP / A2A transports)
     # ------------------------------------------------------------------ #
 
-    # Map tool/action names to equivalent HTTP method + path
-    _TOOL_TO_HTTP: Dict[str, tuple] = {
+    # Map tool/action names to equivalent HTTP method + path.
+    # Rebound after the class body to a read-only proxy with interned keys
+    # (see module bottom); lookups then hit the identity fast path.
+    _TOOL_TO_HTTP: Mapping[str, tuple] = {
         # MCP tool names
         "create_checkout": ("POST", "/checkout-sessions"),
         "update_checkout": ("PUT", "/checkout-sessions/{id}"),
@@ -196,6 +435,11 @@ class UCPResponseParser:
         "a2a.ucp.capability.negotiate": ("POST", "/capabilities/negotiate"),
     }
 
+    # tool name → event type, precomputed from _TOOL_TO_HTTP after the
+    # class body (see module bottom).  Used as a direct fast path when no
+    # status-code or body-status override can apply.
+    _TOOL_TO_EVENT: Dict[str, UCPEventType] = {}
+
     @classmethod
     def classify_jsonrpc(
         cls,
@@ -206,15 +450,25 @@ class UCPResponseParser:
         """Classify a JSON-RPC tool/action name into a UCP event type.
 
         Used for MCP (tools/call) and A2A (tasks/send) transports.
-        Maps tool names to HTTP equivalents, then delegates to classify().
+        Known tool names resolve through a precomputed direct map; the
+        classify() delegation only runs when the status code or the body
+        ``status`` could override the path-derived event (errors,
+        escalations, order lifecycle statuses).
         """
         # Capability negotiation keywords (check before _TOOL_TO_HTTP
         # since /capabilities/negotiate doesn't match classify() patterns)
         if "negotiate" in tool_name or "capability" in tool_name:
             return UCPEventType.CAPABILITY_NEGOTIATED
 
+        # Tool names have finite cardinality but arrive freshly allocated
+        # from JSON parsing; interning restores pointer-equal dict probes.
+        tool_name = sys.intern(tool_name)
         mapping = cls._TOOL_TO_HTTP.get(tool_name)
         if mapping:
+            if status_code < 400 and not (
+                response_body and response_body.get("status")
+            ):
+                return cls._TOOL_TO_EVENT[tool_name]
             method, path = mapping
             return cls.classify(method, path, status_code, response_body)
 
@@ -234,206 +488,195 @@ class UCPResponseParser:
     # ------------------------------------------------------------------ #
 
     @classmethod
-    def extract(cls, body: Optional[dict]) -> Dict[str, Any]:
+    def extract(
+        cls,
+        body: Optional[dict],
+        raw_body: Optional[bytes | str] = None,
+    ) -> Dict[str, Any]:
         """Extract analytics fields from a UCP checkout/order JSON body.
 
         Works with both request bodies (partial) and response bodies (full).
         Returns a dict of field_name → value; callers merge into UCPEvent.
+
+        When *raw_body* (the undecoded wire JSON that *body* was parsed
+        from) is provided, pass-through fields like ``line_items_json`` are
+        sliced out of the raw text instead of being re-serialized.
         """
-        if not body or not isinstance(body, dict):
+        if not body or type(body) is not dict:
             return {}
 
+        if isinstance(raw_body, bytes):
+            try:
+                raw_body = raw_body.decode("utf-8")
+            except UnicodeDecodeError:
+                raw_body = None
+
         result: Dict[str, Any] = {}
 
         # --- session / order id ---
-        raw_id = body.get("id", "")
-        id_str = str(raw_id) if raw_id else ""
-        if id_str:
+        raw_id = body.get("id")
+        if raw_id:
+            id_str = raw_id if type(raw_id) is str else str(raw_id)
             # Heuristic: order objects have checkout_id; checkout objects don't
-            if "checkout_id" in body:
+            if (checkout_id := body.get("checkout_id")) is not None:
+                result["order_id"] = id_str
+                result["checkout_session_id"] = checkout_id
+            elif "checkout_id" in body:  # present but null → still an order
                 result["order_id"] = id_str
-                result["checkout_session_id"] = body["checkout_id"]
             else:
                 result["checkout_session_id"] = id_str
 
-        if "order_id" in body:
-            result["order_id"] = body["order_id"]
+        if (order_id := body.get("order_id")) is not None:
+            result["order_id"] = order_id
+
+        # --- commerce payload (one set probe gates all six sections) ---
+        if not _COMMERCE_KEYS.isdisjoint(body):
+            # order confirmation in checkout response (spec: checkout.order)
+            order_obj = body.get("order")
+            if type(order_obj) is dict:
+                order_id = order_obj.get("id")
+                if order_id:
+                    result["order_id"] = str(order_id)
+                permalink = order_obj.get("permalink_url")
+                if permalink:
+                    result["permalink_url"] = permalink
+
+            # totals array
+            if "totals" in body:
+                cls._extract_totals(body["totals"], result)
+
+            # line items
+            items = body.get("line_items")
+            if type(items) is list and items:
+                result["line_item_count"] = len(items)
+                sliced = _raw_json_slice(raw_body, "line_items") if raw_body else None
+                result["line_items_json"] = (
+                    sliced if sliced is not None else _dumps(items)
+                )
 
-        # --- order confirmation in checkout response (spec: checkout.order) ---
-        order_obj = body.get("order")
-        if isinstance(order_obj, dict):
-            order_id = order_obj.get("id")
-            if order_id:
-                result["order_id"] = str(order_id)
-            permalink = order_obj.get("permalink_url")
-            if permalink:
-                result["permalink_url"] = permalink
+            if "payment" in body or "payment_data" in body:
+                # payment (spec: payment.instruments[], fallback: handlers[])
+                cls._extract_payment(body, result)
+
+                # discovery: payment.handlers at the top level (sibling of
+                # ucp): {"ucp": {...}, "payment": {"handlers": [...]}}.
+                # Only consulted if _extract_payment found no instrument.
+                if "payment_handler_id" not in result:
+                    payment = body.get("payment")
+                    if type(payment) is dict:
+                        handlers = payment.get("handlers")
+                        if type(handlers) is list and handlers:
+                            first = handlers[0]
+                            if type(first) is dict:
+                                _set(
+                                    result,
+                                    "payment_handler_id",
+                                    first.get("id") or first.get("name"),
+                                )
+
+            # fulfillment extension
+            if "fulfillment" in body:
+                cls._extract_fulfillment(body["fulfillment"], result)
+
+            # discount extension
+            if "discounts" in body:
+                cls._extract_discounts(body["discounts"], result)
 
         # --- permalink_url (direct on order objects) ---
         if "permalink_url" in body:
-            result["permalink_url"] = body["permalink_url"]
+            _set(result, "permalink_url", body["permalink_url"])
 
         # --- status ---
         if "status" in body:
             # Only write checkout_status for checkout responses, not orders/carts
             if "checkout_id" not in body:
                 status_val = body["status"]
-                _CHECKOUT_STATUSES = {
-                    "incomplete", "requires_escalation", "ready_for_complete",
-                    "complete_in_progress", "completed", "canceled",
-                }
                 if status_val in _CHECKOUT_STATUSES:
                     result["checkout_status"] = status_val
 
         # --- currency ---
         if "currency" in body:
-            result["currency"] = body["currency"]
-
-        # --- totals array ---
-        cls._extract_totals(body.get("totals"), result)
-
-        # --- line items ---
-        items = body.get("line_items")
-        if isinstance(items, list) and items:
-            result["line_item_count"] = len(items)
-            result["line_items_json"] = json.dumps(items, default=str)
+            _set(result, "currency", body["currency"])
 
         # --- ucp metadata envelope ---
-        cls._extract_ucp_metadata(body.get("ucp"), result)
-
-        # --- discovery: payment.handlers at top level (sibling of ucp) ---
-        cls._extract_discovery_payment(body.get("payment"), result)
-
-        # --- payment (spec: payment.instruments[], fallback: payment.handlers[]) ---
-        cls._extract_payment(body, result)
-
-        # --- fulfillment extension ---
-        cls._extract_fulfillment(body.get("fulfillment"), result)
-
-        # --- discount extension ---
-        cls._extract_discounts(body.get("discounts"), result)
+        # (inlined: almost always absent or tiny, not worth a call frame)
+        ucp_meta = body.get("ucp")
+        if type(ucp_meta) is dict:
+            _set(result, "ucp_version", ucp_meta.get("version"))
+            caps_raw = ucp_meta.get("capabilities")
+            if caps_raw:
+                caps_list = cls._normalize_registry(caps_raw)
+                if caps_list:
+                    result["capabilities_json"] = _dumps(caps_list)
 
         # --- checkout metadata ---
         if "expires_at" in body:
-            result["expires_at"] = body["expires_at"]
+            _set(result, "expires_at", body["expires_at"])
         if "continue_url" in body:
-            result["continue_url"] = body["continue_url"]
+            _set(result, "continue_url", body["continue_url"])
 
         # --- identity linking ---
         if "provider" in body:
-            result["identity_provider"] = body["provider"]
+            _set(result, "identity_provider", body["provider"])
         if "scope" in body:
-            result["identity_scope"] = body["scope"]
+            _set(result, "identity_scope", body["scope"])
         # Nested identity object
         identity = body.get("identity")
-        if isinstance(identity, dict):
+        if type(identity) is dict:
             if "provider" in identity:
-                result["identity_provider"] = identity["provider"]
+                _set(result, "identity_provider", identity["provider"])
             if "scope" in identity:
-                result["identity_scope"] = identity["scope"]
+                _set(result, "identity_scope", identity["scope"])
 
         # --- messages (errors / warnings from the server) ---
         messages = body.get("messages")
-        if isinstance(messages, list) and messages:
-            result["messages_json"] = json.dumps(messages, default=str)
-            for msg in messages:
-                if isinstance(msg, dict) and msg.get("type") == "error":
-                    result["error_code"] = msg.get("code")
-                    result["error_message"] = msg.get("content")
-                    result["error_severity"] = msg.get("severity")
-                    break
+        if type(messages) is list and messages:
+            sliced = _raw_json_slice(raw_body, "messages") if raw_body else None
+            result["messages_json"] = sliced if sliced is not None else _dumps(messages)
+            err = next(
+                (m for m in messages if type(m) is dict and m.get("type") == "error"),
+                None,
+            )
+            if err is not None:
+                _set(result, "error_code", err.get("code"))
+                _set(result, "error_message", err.get("content"))
+                _set(result, "error_severity", err.get("severity"))
 
         # --- links ---
         links = body.get("links")
-        if isinstance(links, list):
+        if type(links) is list:
             for link in links:
-                if isinstance(link, dict) and link.get("type") == "order":
-                    result["order_id"] = result.get("order_id") or link.get("url")
+                if type(link) is dict and link.get("type") == "order":
+                    _set(result, "order_id", result.get("order_id") or link.get("url"))
 
-        # Drop None values
-        return {k: v for k, v in result.items() if v is not None}
+        # Helpers only ever store non-None values, so no drop-None sweep.
+        return result
 
     # ------------------------------------------------------------------ #
     # Helpers
     # ------------------------------------------------------------------ #
 
-    @classmethod
-    def _extract_totals(cls, totals: Any, result: Dict[str, Any]) -> None:
+    # Spec total type → result field (single lookup instead of an if/elif
+    # chain of string compares per total item).  Kept as a class attribute
+    # for discoverability; the hot loop reads the module-level alias.
+    _TOTAL_TYPE_MAP = _TOTAL_TYPE_MAP
+
+    @staticmethod
+    def _extract_totals(totals: Any, result: Dict[str, Any]) -> None:
         """Parse the UCP totals array into individual amount fields.
 
         Spec total types: items_discount, subtotal, discount, fulfillment,
         tax, fee, total.
         """
-        if not isinstance(totals, list):
+        if type(totals) is not list:
             return
+        type_map = _TOTAL_TYPE_MAP
         for item in totals:
-            if not isinstance(item, dict):
+            if type(item) is not dict:
                 continue
-            t_type = item.get("type", "")
-            amount = item.get("amount")
-            if amount is None:
-                continue
-            if t_type == "items_discount":
-                result["items_discount_amount"] = amount
-            elif t_type == "subtotal":
-                result["subtotal_amount"] = amount
-            elif t_type == "discount":
-                result["discount_amount"] = amount
-            elif t_type == "fulfillment":
-                result["fulfillment_amount"] = amount
-            elif t_type == "tax":
-                result["tax_amount"] = amount
-            elif t_type == "fee":
-                result["fee_amount"] = amount
-            elif t_type == "total":
-                result["total_amount"] = amount
-
-    @classmethod
-    def _extract_ucp_metadata(cls, ucp_meta: Any, result: Dict[str, Any]) -> None:
-        """Parse the UCP metadata envelope.
-
-        Per the Python SDK and samples, capabilities are arrays of objects
-        with a ``name`` field::
-
-            [{"name": "dev.ucp.shopping.checkout", "version": "2026-01-11"}]
-
-        For robustness, also handles an object-keyed format where capability
-        names are dict keys (e.g. ``{"dev.ucp.shopping.checkout": [...]}``)
-        by normalizing to the array format.
-        """
-        if not isinstance(ucp_meta, dict):
-            return
-
-        result["ucp_version"] = ucp_meta.get("version")
-
-        caps_raw = ucp_meta.get("capabilities")
-        if caps_raw:
-            caps_list = cls._normalize_registry(caps_raw)
-            if caps_list:
-                result["capabilities_json"] = json.dumps(caps_list, default=str)
-
-    @classmethod
-    def _extract_discovery_payment(cls, payment: Any, result: Dict[str, Any]) -> None:
-        """Extract payment handler info from the discovery profile.
-
-        In the SDK, discovery responses place payment handlers at the
-        top level as a sibling of ``ucp``::
-
-            {"ucp": {...}, "payment": {"handlers": [...]}}
-
-        This is separate from ``_extract_payment()`` which handles
-        the ``payment`` object inside checkout/order responses.
-        """
-        if not isinstance(payment, dict):
-            return
-        handlers = payment.get("handlers")
-        if not isinstance(handlers, list) or not handlers:
-            return
-        # Only set if _extract_payment hasn't already found an instrument
-        if "payment_handler_id" not in result:
-            first = handlers[0]
-            if isinstance(first, dict):
-                result["payment_handler_id"] = first.get("id") or first.get("name")
+            key = type_map.get(item.get("type", ""))
+            if key is not None and (amount := item.get("amount")) is not None:
+                result[key] = amount
 
     @classmethod
     def _normalize_registry(cls, raw: Any) -> list:
@@ -447,17 +690,17 @@ class UCPResponseParser:
 
             {"dev.ucp.shopping.checkout": [{"version": "2026-01-11"}]}
         """
-        if isinstance(raw, list):
+        if type(raw) is list:
             return raw
-        if isinstance(raw, dict):
+        if type(raw) is dict:
             flat = []
             for domain_name, entries in raw.items():
-                if isinstance(entries, list):
+                if type(entries) is list:
                     for entry in entries:
-                        if isinstance(entry, dict):
+                        if type(entry) is dict:
                             item = {"name": domain_name, **entry}
                             flat.append(item)
-                elif isinstance(entries, dict):
+                elif type(entries) is dict:
                     flat.append({"name": domain_name, **entries})
             return flat
         return []
@@ -471,105 +714,131 @@ class UCPResponseParser:
         are preferred for analytics since they carry ``handler_id``, ``type``,
         and ``brand``.
         """
-        payment = body.get("payment") or {}
-        payment_data = body.get("payment_data") or {}
-
         # payment_data (from complete request/response)
-        if isinstance(payment_data, dict) and payment_data:
-            result["payment_handler_id"] = payment_data.get(
-                "handler_id"
-            ) or payment_data.get("id")
-            result["payment_instrument_type"] = payment_data.get("type")
-            result["payment_brand"] = payment_data.get("brand")
+        payment_data = body.get("payment_data")
+        if type(payment_data) is dict and payment_data:
+            _set(
+                result,
+                "payment_handler_id",
+                payment_data.get("handler_id") or payment_data.get("id"),
+            )
+            _set(result, "payment_instrument_type", payment_data.get("type"))
+            _set(result, "payment_brand", payment_data.get("brand"))
             return
 
-        if not isinstance(payment, dict) or not payment:
+        payment = body.get("payment")
+        if type(payment) is not dict or not payment:
             return
 
         # Spec format: payment.instruments[] (each instrument has handler_id)
         instruments = payment.get("instruments")
-        if isinstance(instruments, list) and instruments:
+        if type(instruments) is list and instruments:
             first = instruments[0]
-            if isinstance(first, dict):
-                result["payment_handler_id"] = first.get("handler_id") or first.get(
-                    "id"
+            if type(first) is dict:
+                _set(
+                    result,
+                    "payment_handler_id",
+                    first.get("handler_id") or first.get("id"),
                 )
-                result["payment_instrument_type"] = first.get("type")
-                result["payment_brand"] = first.get("brand")
+                _set(result, "payment_instrument_type", first.get("type"))
+                _set(result, "payment_brand", first.get("brand"))
             return
 
         # Legacy/demo format: payment.handlers[]
         handlers = payment.get("handlers")
-        if isinstance(handlers, list) and handlers:
+        if type(handlers) is list and handlers:
             first = handlers[0]
-            if isinstance(first, dict):
-                result["payment_handler_id"] = first.get("id")
-                result["payment_instrument_type"] = first.get("type")
-                result["payment_brand"] = first.get("brand")
+            if type(first) is dict:
+                _set(result, "payment_handler_id", first.get("id"))
+                _set(result, "payment_instrument_type", first.get("type"))
+                _set(result, "payment_brand", first.get("brand"))
             return
 
         # Direct fields
-        result["payment_handler_id"] = payment.get("handler_id") or payment.get("id")
-        result["payment_instrument_type"] = payment.get("type")
-        result["payment_brand"] = payment.get("brand")
-
-    @classmethod
-    def _extract_fulfillment(cls, fulfillment: Any, result: Dict[str, Any]) -> None:
+        _set(
+            result,
+            "payment_handler_id",
+            payment.get("handler_id") or payment.get("id"),
+        )
+        _set(result, "payment_instrument_type", payment.get("type"))
+        _set(result, "payment_brand", payment.get("brand"))
+
+    @staticmethod
+    def _extract_fulfillment(fulfillment: Any, result: Dict[str, Any]) -> None:
         """Extract fulfillment fields.
 
         Handles both checkout fulfillment (methods[]) and order fulfillment
         (expectations[]/events[]).
         """
-        if not isinstance(fulfillment, dict):
+        if type(fulfillment) is not dict:
             return
 
         # Checkout: fulfillment.methods[]
         methods = fulfillment.get("methods")
-        if isinstance(methods, list) and methods:
+        if type(methods) is list and methods:
             first = methods[0]
-            if isinstance(first, dict):
-                result["fulfillment_type"] = first.get("type")
+            if type(first) is dict:
+                _set(result, "fulfillment_type", first.get("type"))
                 dests = first.get("destinations", [])
-                if isinstance(dests, list) and dests:
+                if type(dests) is list and dests:
                     dest = dests[0]
-                    if isinstance(dest, dict):
+                    if type(dest) is dict:
                         # SDK: destination is a PostalAddress (direct fields)
                         # or has a nested address object
                         country = dest.get("address_country")
                         if not country:
                             addr = dest.get("address")
-                            if isinstance(addr, dict):
+                            if type(addr) is dict:
                                 country = addr.get("address_country")
-                        result["fulfillment_destination_country"] = country
+                        _set(result, "fulfillment_destination_country", country)
             return
 
         # Order: fulfillment.expectations[]
         expectations = fulfillment.get("expectations")
-        if isinstance(expectations, list) and expectations:
+        if type(expectations) is list and expectations:
             first = expectations[0]
-            if isinstance(first, dict):
-                result["fulfillment_type"] = first.get("method_type") or first.get(
-                    "type"
+            if type(first) is dict:
+                _set(
+                    result,
+                    "fulfillment_type",
+                    first.get("method_type") or first.get("type"),
                 )
                 dest = first.get("destination")
-                if isinstance(dest, dict):
-                    result["fulfillment_destination_country"] = dest.get(
-                        "address_country"
+                if type(dest) is dict:
+                    _set(
+                        result,
+                        "fulfillment_destination_country",
+                        dest.get("address_country"),
                     )
 
-    @classmethod
-    def _extract_discounts(cls, discounts: Any, result: Dict[str, Any]) -> None:
+    @staticmethod
+    def _extract_discounts(discounts: Any, result: Dict[str, Any]) -> None:
         """Extract discount extension fields.
 
         Spec: discounts.codes (input), discounts.applied (output).
         """
-        if not isinstance(discounts, dict):
+        if type(discounts) is not dict:
             return
 
         codes = discounts.get("codes")
-        if isinstance(codes, list) and codes:
-            result["discount_codes_json"] = json.dumps(codes, default=str)
+        if type(codes) is list and codes:
+            result["discount_codes_json"] = _dumps(codes)
 
         applied = discounts.get("applied")
-        if isinstance(applied, list) and applied:
-            result["discount_applied_json"] = json.dumps(applied, default=str)
+        if type(applied) is list and applied:
+            result["discount_applied_json"] = _dumps(applied)
+
+
+# Freeze the tool map: interned keys give identity-based lookups, and the
+# mapping proxy documents that the table is read-only at runtime.
+UCPResponseParser._TOOL_TO_HTTP = MappingProxyType(
+    {sys.intern(k): v for k, v in UCPResponseParser._TOOL_TO_HTTP.items()}
+)
+
+# Precompute the direct tool-name → event map now that classify() exists.
+# With a 200 status and no body, classify() is a pure function of the
+# (method, path) pair, so each _TOOL_TO_HTTP entry maps deterministically.
+UCPResponseParser._TOOL_TO_EVENT = {
+    tool: UCPResponseParser.classify(method, path, 200, None)
+    for tool, (method, path) in UCPResponseParser._TOOL_TO_HTTP.items()
+}
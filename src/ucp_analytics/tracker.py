@@ -9,15 +9,27 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import re
+import sys
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
 
-from ucp_analytics.events import UCPEvent
+from ucp_analytics.events import UCP_EVENT_FIELDS, UCPEvent
 from ucp_analytics.parser import UCPResponseParser
 from ucp_analytics.writer import AsyncBigQueryWriter
 
 logger = logging.getLogger(__name__)
 
+# Fast path for the common URL shape: optional http(s)://host[:port], then
+# path.  The lookahead rejects anything fancier (userinfo, odd schemes) so
+# those fall back to urlparse.
+_URL_RE = re.compile(r"^(?:https?://([^/:@?#]+)(?::\d+)?)?(?=[/?#]|$)(/[^?#]*)?")
+
+# Interned header names so per-event lookups hit the pointer-compare path.
+_UCP_AGENT = sys.intern("ucp-agent")
+_IDEMPOTENCY_KEY = sys.intern("idempotency-key")
+_REQUEST_ID = sys.intern("request-id")
+
 
 class UCPAnalyticsTracker:
     """Records UCP commerce events into BigQuery.
@@ -75,7 +87,15 @@ class UCPAnalyticsTracker:
                 "postal_code",
             ]
         )
+        # Lowercased once so _redact never allocates k.lower() for the
+        # common all-lowercase JSON key case.
+        self._pii_lc = frozenset(f.lower() for f in self.pii_fields)
         self.custom_metadata = custom_metadata
+        # custom_metadata is fixed after construction; serialize it once
+        # instead of per event.
+        self._custom_metadata_json = (
+            json.dumps(custom_metadata) if custom_metadata else None
+        )
 
         self._writer = AsyncBigQueryWriter(
             project_id=project_id,
@@ -101,19 +121,38 @@ class UCPAnalyticsTracker:
         response_body: Optional[dict] = None,
         latency_ms: Optional[float] = None,
         request_headers: Optional[Dict[str, str]] = None,
+        request_raw: Optional[bytes] = None,
+        response_raw: Optional[bytes] = None,
     ) -> UCPEvent:
         """Record a single UCP HTTP request/response pair.
 
         This is the core method called by the middleware / hooks.
+
+        ``request_raw`` / ``response_raw`` are the wire bytes the body
+        dicts were parsed from; when provided, the parser slices
+        pass-through JSON fields out of them instead of re-serializing.
+        With ``redact_pii`` enabled the raw bytes are ignored — the
+        slices would predate redaction — and those fields are serialized
+        from the redacted tree.
         """
         headers = request_headers or {}
 
-        # Resolve path and host from url
-        parsed_url = urlparse(url) if url else None
-        if not path and parsed_url:
-            path = parsed_url.path
-
-        merchant_host = (parsed_url.hostname or "") if parsed_url else ""
+        # Resolve path and host from url.  The regex covers the common
+        # shape without building a ParseResult; urlparse handles the rest.
+        merchant_host = ""
+        if url:
+            m = _URL_RE.match(url)
+            if m:
+                host = m.group(1)
+                if host:
+                    merchant_host = host if host.islower() else host.lower()
+                if not path:
+                    path = m.group(2) or ""
+            else:
+                parsed_url = urlparse(url)
+                merchant_host = parsed_url.hostname or ""
+                if not path:
+                    path = parsed_url.path
 
         # Classify (pass request_body for webhook flows where payload
         # is in the request and response is just an ack)
@@ -122,7 +161,9 @@ class UCPAnalyticsTracker:
             request_body=request_body,
         )
 
-        # Build event
+        # Build event (bind headers.get once; Headers mappings lowercase
+        # per lookup, so keep it to three calls through one bound method)
+        _get = headers.get
         event = UCPEvent(
             event_type=event_type.value,
             app_name=self.app_name,
@@ -131,9 +172,9 @@ class UCPAnalyticsTracker:
             http_path=path,
             http_status_code=status_code if status_code else None,
             latency_ms=latency_ms,
-            platform_profile_url=headers.get("ucp-agent", ""),
-            idempotency_key=headers.get("idempotency-key", ""),
-            request_id=headers.get("request-id", ""),
+            platform_profile_url=_get(_UCP_AGENT, ""),
+            idempotency_key=_get(_IDEMPOTENCY_KEY, ""),
+            request_id=_get(_REQUEST_ID, ""),
         )
 
         # Extract UCP fields from response (preferred) or request.
@@ -142,19 +183,23 @@ class UCPAnalyticsTracker:
         is_webhook = "/webhook" in path
         if is_webhook and request_body:
             body_to_parse = request_body
+            raw_to_parse = request_raw
         else:
             body_to_parse = response_body or request_body
+            raw_to_parse = response_raw if response_body else request_raw
         if body_to_parse and isinstance(body_to_parse, dict):
             if self.redact_pii:
                 body_to_parse = self._redact(body_to_parse)
-            fields = UCPResponseParser.extract(body_to_parse)
-            for key, val in fields.items():
-                if hasattr(event, key):
-                    setattr(event, key, val)
+                # Raw slices would bypass the tree walk; serialize
+                # *_json fields from the redacted tree instead.
+                raw_to_parse = None
+            fields = UCPResponseParser.extract(body_to_parse, raw_body=raw_to_parse)
+            for key in UCP_EVENT_FIELDS.intersection(fields):
+                setattr(event, key, fields[key])
 
-        # Attach custom metadata
-        if self.custom_metadata:
-            event.custom_metadata_json = json.dumps(self.custom_metadata)
+        # Attach custom metadata (pre-serialized)
+        if self._custom_metadata_json:
+            event.custom_metadata_json = self._custom_metadata_json
 
         await self._writer.enqueue(event.to_bq_row())
         return event
@@ -197,12 +242,11 @@ class UCPAnalyticsTracker:
             if self.redact_pii:
                 response_body = self._redact(response_body)
             fields = UCPResponseParser.extract(response_body)
-            for key, val in fields.items():
-                if hasattr(event, key):
-                    setattr(event, key, val)
+            for key in UCP_EVENT_FIELDS.intersection(fields):
+                setattr(event, key, fields[key])
 
-        if self.custom_metadata:
-            event.custom_metadata_json = json.dumps(self.custom_metadata)
+        if self._custom_metadata_json:
+            event.custom_metadata_json = self._custom_metadata_json
 
         await self._writer.enqueue(event.to_bq_row())
         return event
@@ -248,11 +292,31 @@ class UCPAnalyticsTracker:
     # ------------------------------------------------------------------ #
 
     def _redact(self, data: Any) -> Any:
-        if isinstance(data, dict):
-            return {
-                k: "[REDACTED]" if k.lower() in self.pii_fields else self._redact(v)
-                for k, v in data.items()
-            }
-        if isinstance(data, list):
-            return [self._redact(item) for item in data]
+        """Return *data* with PII values replaced, sharing untouched subtrees.
+
+        Copy-on-write: containers are cloned only on the branches where a
+        value actually changes, so PII-free subtrees come back by
+        reference with no allocation at any depth.
+        """
+        if type(data) is dict:
+            pii = self._pii_lc
+            out = None
+            for k, v in data.items():
+                if (k if k.islower() else k.lower()) in pii:
+                    if out is None:
+                        out = dict(data)
+                    out[k] = "[REDACTED]"
+                elif (nv := self._redact(v)) is not v:
+                    if out is None:
+                        out = dict(data)
+                    out[k] = nv
+            return out if out is not None else data
+        if type(data) is list:
+            out = None
+            for i, item in enumerate(data):
+                if (nv := self._redact(item)) is not item:
+                    if out is None:
+                        out = list(data)
+                    out[i] = nv
+            return out if out is not None else data
         return data
@@ -3,22 +3,57 @@
 Auto-creates the target table (partitioned + clustered) if it does not
 exist.  Buffers rows and flushes when batch_size is reached or on
 explicit flush()/close().
+
+Writes use the legacy streaming-insert API (insert_rows_json) rather
+than the Storage Write API: analytics event volumes here sit well under
+the point where gRPC/protobuf AppendRows pays for its extra dependency
+(google-cloud-bigquery-storage) and runtime proto-descriptor
+generation.  Revisit if per-table throughput approaches the legacy
+API's quota limits.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, List
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Deque, Dict, List
 
 logger = logging.getLogger(__name__)
 
+# BigQuery's legacy streaming API caps requests at 50,000 rows and performs
+# best well below that; 500 rows/request is the documented sweet spot.
+MAX_ROWS_PER_INSERT = 500
+
+# One bigquery.Client per project, shared across writers: each client owns
+# its own auth credentials and HTTP connection pool, a multi-hundred-ms
+# setup cost not worth paying per tracker.
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def shutdown() -> None:
+    """Close and drop all shared BigQuery clients.
+
+    Writers do not close the shared client in :meth:`AsyncBigQueryWriter.close`;
+    call this once at process teardown instead.
+    """
+    with _CLIENT_LOCK:
+        clients = list(_CLIENT_CACHE.values())
+        _CLIENT_CACHE.clear()
+    for client in clients:
+        client.close()
+
 
 # ---------------------------------------------------------------------------
 # BigQuery schema (aligned with UCPEvent.to_bq_row())
 # ---------------------------------------------------------------------------
 
-BQ_SCHEMA_FIELDS = [
+BQ_SCHEMA_FIELDS = (
     # identity
     ("event_id", "STRING", "REQUIRED"),
     ("event_type", "STRING", "REQUIRED"),
@@ -82,7 +117,12 @@ BQ_SCHEMA_FIELDS = [
     ("latency_ms", "FLOAT", "NULLABLE"),
     # custom
     ("custom_metadata_json", "JSON", "NULLABLE"),
-]
+)
+
+# Stable column order for positional/bulk serialization.  Names are
+# interned so row-dict lookups hit the pointer-compare fast path.
+SCHEMA_NAMES = tuple(sys.intern(name) for name, _, _ in BQ_SCHEMA_FIELDS)
+SCHEMA_TYPES = tuple(bq_type for _, bq_type, _ in BQ_SCHEMA_FIELDS)
 
 
 # ---------------------------------------------------------------------------
@@ -102,17 +142,25 @@ OPTIONS(
 """
 
 
-def get_ddl(project: str, dataset: str, table: str) -> str:
-    """Return the CREATE TABLE DDL for manual execution."""
+def _build_ddl_columns() -> str:
     col_lines = []
     for name, bq_type, mode in BQ_SCHEMA_FIELDS:
         not_null = " NOT NULL" if mode == "REQUIRED" else ""
         # Map our shorthand to BQ SQL types
         sql_type = {"INTEGER": "INT64", "FLOAT": "FLOAT64"}.get(bq_type, bq_type)
         col_lines.append(f"  {name} {sql_type}{not_null}")
-    columns = ",\n".join(col_lines)
+    return ",\n".join(col_lines)
+
+
+# The column block never varies; only the table identifier does.
+_DDL_COLUMNS = _build_ddl_columns()
+
+
+@lru_cache(maxsize=32)
+def get_ddl(project: str, dataset: str, table: str) -> str:
+    """Return the CREATE TABLE DDL for manual execution."""
     return DDL_TEMPLATE.format(
-        project=project, dataset=dataset, table=table, columns=columns
+        project=project, dataset=dataset, table=table, columns=_DDL_COLUMNS
     )
 
 
@@ -132,6 +180,8 @@ class AsyncBigQueryWriter:
         batch_size: int = 50,
         auto_create_table: bool = True,
         max_buffer_size: int = 10_000,
+        flush_interval_ms: float = 200.0,
+        max_inflight: int = 4,
     ):
         self.project_id = project_id
         self.dataset_id = dataset_id
@@ -139,23 +189,46 @@ class AsyncBigQueryWriter:
         self.batch_size = batch_size
         self.auto_create_table = auto_create_table
         self.max_buffer_size = max_buffer_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_inflight = max_inflight
+        self.full_table_id = f"{project_id}.{dataset_id}.{table_id}"
 
-        self._buffer: List[Dict[str, Any]] = []
-        self._lock = asyncio.Lock()
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max_buffer_size)
+        # Dedicated pool for the blocking BigQuery calls: keeps them off
+        # the shared default executor (no per-call executor lookup or
+        # contextvars copy, and other to_thread users aren't starved).
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_inflight, thread_name_prefix="bq-writer"
+        )
         self._client = None
         self._table_ensured = False
+        self._ensure_task: asyncio.Task | None = None
+        # Flush worker state.  The worker is started lazily from enqueue()
+        # because __init__ may run outside an event loop.
+        self._worker: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._pending: set[asyncio.Task] = set()
+        self._closed = False
 
-    @property
-    def full_table_id(self) -> str:
-        return f"{self.project_id}.{self.dataset_id}.{self.table_id}"
+    async def _run_blocking(self, fn, *args):
+        """Run a blocking callable on the writer's dedicated thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, fn, *args
+        )
 
     # -- lazy init --
 
     def _get_client(self):
         if self._client is None:
-            from google.cloud import bigquery
+            with _CLIENT_LOCK:
+                client = _CLIENT_CACHE.get(self.project_id)
+                if client is None:
+                    from google.cloud import bigquery
 
-            self._client = bigquery.Client(project=self.project_id)
+                    client = bigquery.Client(project=self.project_id)
+                    _CLIENT_CACHE[self.project_id] = client
+            self._client = client
         return self._client
 
     def _ensure_table_sync(self):
@@ -182,77 +255,171 @@ class AsyncBigQueryWriter:
         logger.info("Ensured table %s", self.full_table_id)
 
     async def _ensure_table(self):
+        """Ensure the table exists, sharing one attempt across callers.
+
+        Concurrent flushes await the same in-flight task instead of each
+        issuing a create_table; a failed attempt is retried by the next
+        flush.  Steady-state flushes never reach this coroutine — they
+        check ``_table_ensured`` inline first.
+        """
         if self._table_ensured or not self.auto_create_table:
             return
+        task = self._ensure_task
+        if task is None or task.done():
+            task = self._ensure_task = asyncio.create_task(self._ensure_table_once())
+        await task
+
+    async def _ensure_table_once(self):
         try:
-            await asyncio.to_thread(self._ensure_table_sync)
+            await self._run_blocking(self._ensure_table_sync)
             self._table_ensured = True
         except Exception:
             logger.exception("Failed to ensure BQ table")
 
+    # -- flush worker --
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """Background flush loop.
+
+        Wakes when enqueue() signals a full batch, or after
+        ``flush_interval_ms`` so partial batches don't linger.  Flushing
+        here decouples callers from the BigQuery insert RTT: enqueue()
+        never blocks on network I/O.
+        """
+        interval = self.flush_interval_ms / 1000.0
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except (asyncio.TimeoutError, TimeoutError):
+                pass
+            self._wakeup.clear()
+            if self._closed:
+                break
+            if self._buffer:
+                self._dispatch_flush()
+
+    def _dispatch_flush(self) -> None:
+        """Launch flush() as an independent, semaphore-bounded task.
+
+        Up to ``max_inflight`` inserts overlap their BigQuery round trips,
+        so one slow insert no longer stalls the wake loop while the next
+        batch accumulates.  flush() swaps the buffer out before awaiting,
+        so concurrent tasks never see the same rows.
+        """
+        task = asyncio.create_task(self._flush_bounded())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _flush_bounded(self) -> None:
+        async with self._inflight:
+            await self.flush()
+
     # -- public API --
 
     async def enqueue(self, row: Dict[str, Any]):
-        should_flush = False
-        async with self._lock:
-            if len(self._buffer) >= self.max_buffer_size:
-                dropped = self._buffer.pop(0)
-                logger.warning(
-                    "Buffer full (%d); dropping oldest event %s",
-                    self.max_buffer_size,
-                    dropped.get("event_id", "?"),
-                )
-            self._buffer.append(row)
-            should_flush = len(self._buffer) >= self.batch_size
-        if should_flush:
-            await self.flush()
+        """Buffer a row for the background flush worker.
+
+        Never blocks on BigQuery.  When the buffer is full the oldest row
+        is dropped (backpressure by shedding, not by stalling the caller).
+        """
+        self._ensure_worker()
+        if len(self._buffer) >= self.max_buffer_size:
+            logger.warning(
+                "Buffer full (%d); dropping oldest event %s",
+                self.max_buffer_size,
+                self._buffer[0].get("event_id", "?"),
+            )
+        # deque(maxlen=...) evicts the oldest row on overflow natively.
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
 
     async def flush(self):
-        async with self._lock:
-            if not self._buffer:
-                return
-            batch = self._buffer.copy()
-            self._buffer.clear()
+        if not self._buffer:
+            return
+        # No await between the copy and the clear, so no lock is needed on
+        # a single-threaded event loop.
+        batch = list(self._buffer)
+        self._buffer.clear()
 
         try:
-            await self._ensure_table()
+            if not self._table_ensured:
+                await self._ensure_table()
             client = self._get_client()
-            errors = await asyncio.to_thread(
-                client.insert_rows_json, self.full_table_id, batch
-            )
-            if errors:
-                # Extract only the failed rows by index
+            # Rows are shallow by design: nested payloads arrive already
+            # serialized into *_json string fields (orjson-encoded when
+            # installed), so insert_rows_json's stdlib encoding only
+            # walks the flat envelope.
+            if len(batch) <= MAX_ROWS_PER_INSERT:
+                error_lists = [
+                    await self._run_blocking(
+                        client.insert_rows_json, self.full_table_id, batch
+                    )
+                ]
+                chunks = [batch]
+            else:
+                # Oversized batches (e.g. re-queued backlogs) are split and
+                # the chunk inserts overlap their network round trips.
+                chunks = [
+                    batch[i : i + MAX_ROWS_PER_INSERT]
+                    for i in range(0, len(batch), MAX_ROWS_PER_INSERT)
+                ]
+                error_lists = await asyncio.gather(
+                    *(
+                        self._run_blocking(
+                            client.insert_rows_json, self.full_table_id, chunk
+                        )
+                        for chunk in chunks
+                    )
+                )
+            # Extract only the failed rows, by per-chunk index
+            failed_rows: List[Dict[str, Any]] = []
+            sample_errors: List[Any] = []
+            for chunk, errors in zip(chunks, error_lists):
+                if not errors:
+                    continue
                 failed_indices = {
                     e["index"] for e in errors if isinstance(e, dict) and "index" in e
                 }
-                failed_rows = [
-                    batch[i] for i in sorted(failed_indices) if i < len(batch)
-                ]
+                failed_rows.extend(
+                    chunk[i] for i in sorted(failed_indices) if i < len(chunk)
+                )
+                if len(sample_errors) < 3:
+                    sample_errors.extend(errors[:3])
+            if failed_rows or sample_errors:
                 logger.error(
                     "BQ insert errors (%d/%d rows failed): %s",
                     len(failed_rows),
                     len(batch),
-                    errors[:3],
+                    sample_errors[:3],
                 )
                 if failed_rows:
-                    async with self._lock:
-                        requeued = failed_rows + self._buffer
-                        if len(requeued) > self.max_buffer_size:
-                            requeued = requeued[: self.max_buffer_size]
-                        self._buffer = requeued
+                    # Prepend; maxlen sheds the newest rows on overflow.
+                    self._buffer.extendleft(reversed(failed_rows))
             else:
                 logger.debug("Flushed %d UCP events", len(batch))
         except Exception:
             logger.exception("BQ flush failed; re-queuing %d rows", len(batch))
-            async with self._lock:
-                # Re-queue but respect max buffer size
-                requeued = batch + self._buffer
-                if len(requeued) > self.max_buffer_size:
-                    requeued = requeued[: self.max_buffer_size]
-                self._buffer = requeued
+            # Re-queue; maxlen sheds the newest rows on overflow
+            self._buffer.extendleft(reversed(batch))
 
     async def close(self):
+        self._closed = True
+        if self._worker is not None:
+            self._wakeup.set()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
         await self.flush()
-        if self._client:
-            self._client.close()
-            self._client = None
+        # All blocking work is done by now, so shutdown doesn't stall.
+        self._executor.shutdown(wait=True)
+        # The client may be shared across writers; shutdown() closes it.
+        self._client = None
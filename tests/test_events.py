@@ -1,6 +1,7 @@
 """Tests for UCPEvent data model."""
 
 from ucp_analytics.events import CheckoutStatus, UCPEvent, UCPEventType
+from ucp_analytics.writer import SCHEMA_NAMES
 
 
 class TestUCPEvent:
@@ -31,6 +32,21 @@ class TestUCPEvent:
         assert row["total_amount"] == 5999
         assert row["currency"] == "USD"
 
+    def test_to_bq_tuple_matches_schema_order(self):
+        event = UCPEvent(
+            event_type="checkout_session_completed",
+            checkout_session_id="chk_123",
+            total_amount=5999,
+        )
+        values = event.to_bq_tuple()
+
+        assert len(values) == len(SCHEMA_NAMES)
+        assert values[SCHEMA_NAMES.index("event_type")] == "checkout_session_completed"
+        assert values[SCHEMA_NAMES.index("checkout_session_id")] == "chk_123"
+        assert values[SCHEMA_NAMES.index("total_amount")] == 5999
+        # Unset fields keep their slot as None
+        assert values[SCHEMA_NAMES.index("currency")] is None
+
     def test_defaults(self):
         event = UCPEvent()
         assert event.event_type == ""
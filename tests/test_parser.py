@@ -708,6 +708,15 @@ class TestWebhookClassification:
             == UCPEventType.ORDER_UPDATED
         )
 
+    def test_non_string_status_falls_through(self):
+        """A dict/list ``status`` (valid JSON) must not break the cache key."""
+        assert (
+            UCPResponseParser.classify(
+                "GET", "/orders/o1", 200, {"status": {"x": 1}}
+            )
+            == UCPEventType.ORDER_UPDATED
+        )
+
     def test_webhook_error_500(self):
         """Webhook 5xx should classify as error, not order_updated."""
         assert (
@@ -753,3 +762,46 @@ class TestCheckoutStatusScoping:
         body = {"id": "chk_123", "status": "requires_escalation"}
         fields = UCPResponseParser.extract(body)
         assert fields["checkout_status"] == "requires_escalation"
+
+
+class TestExtractRawBody:
+    def test_line_items_sliced_from_raw(self):
+        body = {"id": "chk_1", "line_items": [{"id": "li_1", "quantity": 2}]}
+        raw = json.dumps(body).encode()
+        fields = UCPResponseParser.extract(body, raw_body=raw)
+        # Exact wire substring, not a re-encode
+        assert fields["line_items_json"] in raw.decode()
+        assert json.loads(fields["line_items_json"]) == body["line_items"]
+        assert fields["line_item_count"] == 1
+
+    def test_messages_sliced_from_raw(self):
+        body = {
+            "id": "chk_1",
+            "messages": [{"type": "error", "code": "out_of_stock"}],
+        }
+        raw = json.dumps(body).encode()
+        fields = UCPResponseParser.extract(body, raw_body=raw)
+        assert fields["messages_json"] in raw.decode()
+        assert json.loads(fields["messages_json"]) == body["messages"]
+
+    def test_falls_back_to_serialization_without_raw(self):
+        body = {"id": "chk_1", "line_items": [{"id": "li_1"}]}
+        fields = UCPResponseParser.extract(body)
+        assert json.loads(fields["line_items_json"]) == body["line_items"]
+
+    def test_ambiguous_key_falls_back(self):
+        # "line_items" appears twice in the raw text; slicing must not
+        # guess which occurrence is the top-level one.
+        body = {
+            "line_items": [{"id": "li_1"}],
+            "order": {"line_items": [{"id": "li_other"}]},
+        }
+        raw = json.dumps(body).encode()
+        fields = UCPResponseParser.extract(body, raw_body=raw)
+        assert json.loads(fields["line_items_json"]) == body["line_items"]
+
+    def test_string_values_with_brackets_do_not_break_slicing(self):
+        body = {"line_items": [{"id": "li_1", "title": 'a "]" weird [ title'}]}
+        raw = json.dumps(body).encode()
+        fields = UCPResponseParser.extract(body, raw_body=raw)
+        assert json.loads(fields["line_items_json"]) == body["line_items"]
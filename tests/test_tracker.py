@@ -191,6 +191,73 @@ class TestPIIRedaction:
         assert redacted["status"] == "incomplete"
         assert redacted["email"] == "[REDACTED]"
 
+    async def test_redact_shares_untouched_subtrees(self, mock_writer):
+        """Copy-on-write: only branches containing PII are cloned."""
+        tracker = UCPAnalyticsTracker(
+            project_id="test",
+            redact_pii=True,
+        )
+        data = {
+            "buyer": {"email": "secret@test.com"},
+            "totals": [{"type": "total", "amount": 100}],
+        }
+        redacted = tracker._redact(data)
+
+        assert redacted is not data
+        assert redacted["buyer"]["email"] == "[REDACTED]"
+        # The PII-free branch is shared by reference, not copied
+        assert redacted["totals"] is data["totals"]
+
+    async def test_redacts_raw_sliced_json_fields(self, mock_writer):
+        """With raw bytes present, *_json fields still come out redacted."""
+        tracker = UCPAnalyticsTracker(
+            project_id="test",
+            redact_pii=True,
+        )
+        body = {
+            "id": "chk_123",
+            "line_items": [{"id": "li_1", "email": "jane@example.com"}],
+        }
+        raw = json.dumps(body).encode("utf-8")
+        event = await tracker.record_http(
+            method="POST",
+            path="/checkout-sessions",
+            status_code=201,
+            response_body=body,
+            response_raw=raw,
+        )
+
+        assert "jane@example.com" not in (event.line_items_json or "")
+        assert "[REDACTED]" in event.line_items_json
+
+    async def test_redacts_container_valued_pii_with_raw_bytes(self, mock_writer):
+        """PII fields holding objects/arrays are redacted and stay valid JSON."""
+        tracker = UCPAnalyticsTracker(
+            project_id="test",
+            redact_pii=True,
+            pii_fields=["email", "shipping_address"],
+        )
+        body = {
+            "id": "chk_123",
+            "line_items": [
+                {
+                    "id": "li_1",
+                    "shipping_address": {"street": "1 Main St", "city": "Springfield"},
+                }
+            ],
+        }
+        raw = json.dumps(body).encode("utf-8")
+        event = await tracker.record_http(
+            method="POST",
+            path="/checkout-sessions",
+            status_code=201,
+            response_body=body,
+            response_raw=raw,
+        )
+
+        assert "1 Main St" not in event.line_items_json
+        assert json.loads(event.line_items_json)[0]["shipping_address"] == "[REDACTED]"
+
     async def test_no_redaction_when_disabled(self, mock_writer):
         tracker = UCPAnalyticsTracker(project_id="test", redact_pii=False)
         await tracker.record_http(
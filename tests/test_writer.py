@@ -1,6 +1,7 @@
 """Tests for AsyncBigQueryWriter."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -28,14 +29,23 @@ class TestAsyncBigQueryWriter:
         writer._client = mock_client
         writer.auto_create_table = False
 
-        await writer.enqueue({"event_id": "1", "event_type": "test"})
-        await writer.enqueue({"event_id": "2", "event_type": "test"})
-        # Third enqueue triggers flush (batch_size=3)
-        with patch("asyncio.to_thread", side_effect=lambda fn, *a: fn(*a)):
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
+            await writer.enqueue({"event_id": "1", "event_type": "test"})
+            await writer.enqueue({"event_id": "2", "event_type": "test"})
+            # Third enqueue wakes the flush worker (batch_size=3)
             await writer.enqueue({"event_id": "3", "event_type": "test"})
+            for _ in range(100):
+                if mock_client.insert_rows_json.called:
+                    break
+                await asyncio.sleep(0.005)
 
         mock_client.insert_rows_json.assert_called_once()
         assert len(writer._buffer) == 0
+        await writer.close()
 
     async def test_flush_empty_noop(self, writer):
         # Should not raise
@@ -49,7 +59,11 @@ class TestAsyncBigQueryWriter:
 
         await writer.enqueue({"event_id": "1", "event_type": "test"})
 
-        with patch("asyncio.to_thread", side_effect=lambda fn, *a: fn(*a)):
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
             await writer.flush()
 
         # Rows should be re-queued
@@ -87,7 +101,11 @@ class TestAsyncBigQueryWriter:
         await writer.enqueue({"event_id": "1", "event_type": "test"})
         await writer.enqueue({"event_id": "2", "event_type": "test"})
 
-        with patch("asyncio.to_thread", side_effect=lambda fn, *a: fn(*a)):
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
             await writer.flush()
 
         # Only the failed row (index 0) should be re-queued
@@ -107,7 +125,11 @@ class TestAsyncBigQueryWriter:
         await writer.enqueue({"event_id": "2", "event_type": "test"})
         await writer.enqueue({"event_id": "3", "event_type": "test"})
 
-        with patch("asyncio.to_thread", side_effect=lambda fn, *a: fn(*a)):
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
             # batch_size=3, but we already have 3 so flush manually
             writer._buffer.clear()
             writer._buffer.extend([
@@ -122,6 +144,57 @@ class TestAsyncBigQueryWriter:
         ids = [r["event_id"] for r in writer._buffer]
         assert ids == ["1", "3"]
 
+    async def test_flush_chunks_oversized_batches(self):
+        """Batches above MAX_ROWS_PER_INSERT are split across insert calls."""
+        writer = AsyncBigQueryWriter(
+            project_id="test",
+            dataset_id="ds",
+            batch_size=2000,  # high so no auto-flush
+            auto_create_table=False,
+        )
+        mock_client = MagicMock()
+        mock_client.insert_rows_json.return_value = []
+        writer._client = mock_client
+
+        writer._buffer.extend({"event_id": str(i)} for i in range(1200))
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
+            await writer.flush()
+
+        sizes = [len(c.args[1]) for c in mock_client.insert_rows_json.call_args_list]
+        assert sizes == [500, 500, 200]
+        assert len(writer._buffer) == 0
+
+    async def test_flush_chunked_requeues_failed_rows_per_chunk(self):
+        """Row-level error indices are resolved against the owning chunk."""
+        writer = AsyncBigQueryWriter(
+            project_id="test",
+            dataset_id="ds",
+            batch_size=2000,
+            auto_create_table=False,
+        )
+        mock_client = MagicMock()
+        # First chunk clean, second chunk fails on its row 1 (batch row 501)
+        mock_client.insert_rows_json.side_effect = [
+            [],
+            [{"index": 1, "errors": [{"reason": "invalid"}]}],
+        ]
+        writer._client = mock_client
+
+        writer._buffer.extend({"event_id": str(i)} for i in range(600))
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
+            await writer.flush()
+
+        assert len(writer._buffer) == 1
+        assert writer._buffer[0]["event_id"] == "501"
+
     async def test_close_flushes(self, writer):
         mock_client = MagicMock()
         mock_client.insert_rows_json.return_value = []
@@ -130,11 +203,34 @@ class TestAsyncBigQueryWriter:
 
         await writer.enqueue({"event_id": "1", "event_type": "test"})
 
-        with patch("asyncio.to_thread", side_effect=lambda fn, *a: fn(*a)):
+        with patch.object(
+            AsyncBigQueryWriter,
+            "_run_blocking",
+            AsyncMock(side_effect=lambda fn, *a: fn(*a)),
+        ):
             await writer.close()
 
         mock_client.insert_rows_json.assert_called_once()
-        mock_client.close.assert_called_once()
+        # The client may be shared; close() drops the reference and
+        # leaves closing to writer.shutdown().
+        mock_client.close.assert_not_called()
+        assert writer._client is None
+
+    async def test_client_shared_per_project(self):
+        from ucp_analytics import writer as writer_mod
+
+        w1 = AsyncBigQueryWriter(project_id="p", dataset_id="d1")
+        w2 = AsyncBigQueryWriter(project_id="p", dataset_id="d2")
+        mock_client = MagicMock()
+        writer_mod._CLIENT_CACHE["p"] = mock_client
+        try:
+            assert w1._get_client() is mock_client
+            assert w2._get_client() is mock_client
+            writer_mod.shutdown()
+            mock_client.close.assert_called_once()
+            assert writer_mod._CLIENT_CACHE == {}
+        finally:
+            writer_mod._CLIENT_CACHE.pop("p", None)
 
     def test_full_table_id(self, writer):
         assert writer.full_table_id == "test-project.test_dataset.test_table"